@@ -1,8 +1,13 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from datetime import datetime
-import plotly.graph_objects as go
+
+import ce_charts
+from ce_figures import compact_figure, payload_stats
+from ce_pipeline import artifact, stage_hash
 
 
 # Set page config
@@ -17,7 +22,57 @@ st.markdown("A data-driven exploration of sustainability trends using Eurostat d
 st.markdown("By Anusha Kogunde Vijaya")
 
 
-tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs(["Overview","Top Waste generators", "Plastic Waste", "Municipal Waste","WEEE","Circular Material","Material Dependency", "Conclusions"])
+# Tables and prepared aggregates come from the shared pipeline (ce_pipeline.py),
+# the same artifacts the notebooks use. Cleaned once at ingest (ce_quality.py):
+# TIME_PERIOD is int, OBS_VALUE is float without NaNs and `is_aggregate` marks
+# EU/euro-area rows. The content hash is part of the cache key, so a changed CSV
+# or stage is picked up without clearing Streamlit's cache.
+@st.cache_data
+def load_artifact(name, digest):
+    return artifact(name)
+
+
+def load_data(name):
+    return load_artifact(name, stage_hash(name))
+
+
+# Charts are sent in compact form (see ce_figures.py); the sidebar toggle shows
+# bytes on the wire and encode time for each chart before and after compaction.
+show_payload_stats = st.sidebar.checkbox("Show chart payload stats")
+chart_stats = []
+
+
+# Charts are prepared and built on a bounded worker pool shared by all sessions.
+# Each section reserves a slot with st.empty() and submits its builder; the slots
+# are filled at the end of the script as the builders finish. Figure building is
+# mostly Python holding the GIL, so builders only overlap while pandas or JSON
+# encoding releases it; no speedup over building them in turn has been measured.
+@st.cache_resource
+def chart_pool():
+    return ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="chart")
+
+
+def build_chart(builder, args, kwargs):
+    return compact_figure(builder(*args, **kwargs))
+
+
+pending_charts = {}
+
+
+def submit_chart(name, builder, *args, **kwargs):
+    slot = st.empty()
+    if show_payload_stats:
+        # Measured one chart at a time on the script thread, so the encode times
+        # are not skewed by other charts building in the pool
+        compact, stats = payload_stats(builder(*args, **kwargs))
+        slot.plotly_chart(compact, use_container_width=True)
+        chart_stats.append({"chart": name, **stats})
+        return
+    future = chart_pool().submit(build_chart, builder, args, kwargs)
+    pending_charts[future] = (name, slot)
+
+
+tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs(["Overview","Top Waste generators", "Plastic Waste", "Municipal Waste","WEEE","Circular Material","Material Dependency", "Country vs EU", "Conclusions"])
 with tab1:
     
 
@@ -82,63 +137,8 @@ with tab1:
 
 with tab2:
     st.header("♻️ Top 10 Waste Generators in Europe")
-    df_waste = pd.read_csv("./Dataset_CE/Total_waste_generation_per_capita.csv")
-    df_filtered = df_waste.copy()
-
-    # Step 1: Filter the last 20 years
-    recent_years = sorted(df_filtered['TIME_PERIOD'].unique())[-20:]
-    df_20yrs = df_filtered[df_filtered['TIME_PERIOD'].isin(recent_years)]
-
-    # Step 2: Rename for consistency
-    df_20yrs = df_20yrs.rename(columns={'Geopolitical entity (reporting)': 'country', 'TIME_PERIOD': 'year'})
-
-    # Step 3: Get top 10 countries per year
-    top10_per_year = (
-        df_20yrs.groupby('year', group_keys=False)
-        .apply(lambda x: x.nlargest(10, 'OBS_VALUE'))
-        .reset_index(drop=True)
-    )
-
-    # Step 4: Create animated bar chart
-    fig = px.bar(
-        top10_per_year,
-        x='country',
-        y='OBS_VALUE',
-        color='country',
-        animation_frame='year',
-        title='Top 10 Waste-Generating Countries in Europe (Last 20 Years)',
-        labels={'OBS_VALUE': 'Waste Generated (Kilograms percapita)', 'country': 'Country'},
-        template='plotly_white'
-    )
-
-    # Step 5: Adjust animation speed and layout
-    fig.update_layout(
-        xaxis={'categoryorder': 'total descending'},
-        yaxis_title='Waste Generated (in Kilograms per capita)',
-        xaxis_title='Country',
-        transition={'duration': 1000},  # 1 second per frame
-        updatemenus=[{
-            'buttons': [
-                {'args': [None, {'frame': {'duration': 1000, 'redraw': True}, 'fromcurrent': True}],
-                'label': 'Play',
-                'method': 'animate'},
-                {'args': [[None], {'frame': {'duration': 0, 'redraw': False}, 'mode': 'immediate'}],
-                'label': 'Pause',
-                'method': 'animate'}
-            ],
-            'direction': 'left',
-            'pad': {'r': 10, 't': 87},
-            'showactive': False,
-            'type': 'buttons',
-            'x': 0.1,
-            'xanchor': 'right',
-            'y': 0,
-            'yanchor': 'top'
-        }]
-    )
-
-
-    st.plotly_chart(fig, use_container_width=True)
+    submit_chart("Top waste generators", ce_charts.top_waste_generators_bar,
+                 load_data("total_waste_top10_per_year"))
 
 with tab3:
     st.header("🛍️ Plastic Packaging Waste Generation vs Plastic Packaging Recycling Rate")
@@ -167,137 +167,17 @@ with tab3:
 
   
 
-    # Read datasets
-    df_plastic_packaging_gen = pd.read_csv("./Dataset_CE/Generation_plastic_pkg_waste_per_capita.csv")
-    df_packaging_recy = pd.read_csv("./Dataset_CE/Recycle_Plastic_pkging.csv")
-
     # --- Plastic Packaging Waste Chart ---
     st.subheader("Plastic Packaging Waste Generation (Top 10)")
-
-    last_20_years = sorted(df_plastic_packaging_gen['TIME_PERIOD'].unique())[-20:]
-    df_recent = df_plastic_packaging_gen[df_plastic_packaging_gen['TIME_PERIOD'].isin(last_20_years)]
-
-    country_totals = df_recent.groupby('Geopolitical entity (reporting)')['OBS_VALUE'].sum().sort_values(ascending=False)
-    top10_countries = country_totals.head(10).index.tolist()
-    top3 = top10_countries[:3]
-    rest = top10_countries[3:]
-
-    germany_entry = [c for c in top10_countries if "Germany" in c]
-    rest_except_germany = [c for c in rest if c != germany_entry[0]] if germany_entry else rest
-
-    df_top10 = df_recent[df_recent['Geopolitical entity (reporting)'].isin(top10_countries)]
-
-    fig = go.Figure()
-
-    top3_colors = ['#1f77b4', '#2a9fd6', '#99ccff']
-    for i, country in enumerate(top3):
-        df_country = df_top10[df_top10['Geopolitical entity (reporting)'] == country]
-        fig.add_trace(go.Scatter(
-            x=df_country['TIME_PERIOD'],
-            y=df_country['OBS_VALUE'],
-            mode='lines+markers',
-            name=country,
-            line=dict(color=top3_colors[i], width=3),
-            marker=dict(size=6)
-        ))
-
-    if germany_entry:
-        df_germany = df_top10[df_top10['Geopolitical entity (reporting)'] == germany_entry[0]]
-        fig.add_trace(go.Scatter(
-            x=df_germany['TIME_PERIOD'],
-            y=df_germany['OBS_VALUE'],
-            mode='lines+markers',
-            name='Germany',
-            line=dict(color='crimson', width=3),
-            marker=dict(size=6, symbol='circle')
-        ))
-
-    grey_shades = ['#cccccc', '#bbbbbb', '#aaaaaa', '#999999', '#888888', '#777777']
-    for i, country in enumerate(rest_except_germany):
-        df_country = df_top10[df_top10['Geopolitical entity (reporting)'] == country]
-        fig.add_trace(go.Scatter(
-            x=df_country['TIME_PERIOD'],
-            y=df_country['OBS_VALUE'],
-            mode='lines',
-            name=country,
-            line=dict(color=grey_shades[i % len(grey_shades)], width=1.5),
-            showlegend=True
-        ))
-
-    fig.update_layout(
-        
-        xaxis_title='Year',
-        yaxis_title='Plastic Waste (Kilograms)',
-        yaxis=dict(rangemode='tozero'),
-        template='plotly_white',
-        legend_title='Country',
-        hovermode='x unified'
-    )
-
-    st.plotly_chart(fig, use_container_width=True)
+    submit_chart("Plastic packaging waste", ce_charts.top10_lines,
+                 load_data("Generation_plastic_pkg_waste_per_capita"), 20,
+                 yaxis_title='Plastic Waste (Kilograms)')
 
     # --- Plastic Packaging Recycling Rate Chart ---
     st.subheader("Plastic Packaging Recycling Rate (Top 10)")
-
-    last_20_years = sorted(df_packaging_recy['TIME_PERIOD'].unique())[-20:]
-    df_recent = df_packaging_recy[df_packaging_recy['TIME_PERIOD'].isin(last_20_years)]
-
-    country_totals = df_recent.groupby('Geopolitical entity (reporting)')['OBS_VALUE'].sum().sort_values(ascending=False)
-    top10_countries = country_totals.head(10).index.tolist()
-    top3 = top10_countries[:3]
-    rest = top10_countries[3:]
-
-    germany_entry = [c for c in top10_countries if "Germany" in c]
-    rest_except_germany = [c for c in rest if c != germany_entry[0]] if germany_entry else rest
-
-    df_top10 = df_recent[df_recent['Geopolitical entity (reporting)'].isin(top10_countries)]
-
-    fig = go.Figure()
-
-    for i, country in enumerate(top3):
-        df_country = df_top10[df_top10['Geopolitical entity (reporting)'] == country]
-        fig.add_trace(go.Scatter(
-            x=df_country['TIME_PERIOD'],
-            y=df_country['OBS_VALUE'],
-            mode='lines+markers',
-            name=country,
-            line=dict(color=top3_colors[i], width=3),
-            marker=dict(size=6)
-        ))
-
-    if germany_entry:
-        df_germany = df_top10[df_top10['Geopolitical entity (reporting)'] == germany_entry[0]]
-        fig.add_trace(go.Scatter(
-            x=df_germany['TIME_PERIOD'],
-            y=df_germany['OBS_VALUE'],
-            mode='lines+markers',
-            name='Germany',
-            line=dict(color='crimson', width=3),
-            marker=dict(size=6, symbol='circle')
-        ))
-
-    for i, country in enumerate(rest_except_germany):
-        df_country = df_top10[df_top10['Geopolitical entity (reporting)'] == country]
-        fig.add_trace(go.Scatter(
-            x=df_country['TIME_PERIOD'],
-            y=df_country['OBS_VALUE'],
-            mode='lines',
-            name=country,
-            line=dict(color=grey_shades[i % len(grey_shades)], width=1.5),
-            showlegend=True
-        ))
-
-    fig.update_layout(
-        
-        xaxis_title='Year',
-        yaxis_title='Plastic Recycling Rate (%)',
-        yaxis=dict(rangemode='tozero'),
-        template='plotly_white',
-        legend_title='Country',
-        hovermode='x unified'
-    )
-
-    st.plotly_chart(fig, use_container_width=True)
+    submit_chart("Plastic packaging recycling", ce_charts.top10_lines,
+                 load_data("Recycle_Plastic_pkging"), 20,
+                 yaxis_title='Plastic Recycling Rate (%)')
 
 
 with tab4:
@@ -328,137 +208,16 @@ with tab4:
     st.markdown("### 📈 Trends in Waste Generation & Recycling Over Time")
 
     # --- Municipal Waste Generation Chart ---
-    df_waste = pd.read_csv("./Dataset_CE/municipal_waste_per_capita.csv")
-    recent_years = sorted(df_waste['TIME_PERIOD'].unique())[-20:]
-    df_recent = df_waste[df_waste['TIME_PERIOD'].isin(recent_years)]
-
-    top10 = df_recent.groupby('Geopolitical entity (reporting)')['OBS_VALUE'].sum().nlargest(10)
-    top3 = top10.index[:3]
-    rest = top10.index[3:]
-
-    germany = [c for c in top10.index if "Germany" in c]
-    if germany:
-        rest = [c for c in rest if c != germany[0]]
-
-    df_top10 = df_recent[df_recent['Geopolitical entity (reporting)'].isin(top10.index)]
-
-    fig_waste = go.Figure()
-    colors = ['#1f77b4', '#2a9fd6', '#99ccff']
-
-    for i, country in enumerate(top3):
-        df_c = df_top10[df_top10['Geopolitical entity (reporting)'] == country]
-        fig_waste.add_trace(go.Scatter(
-            x=df_c['TIME_PERIOD'],
-            y=df_c['OBS_VALUE'],
-            mode='lines+markers',
-            name=country,
-            line=dict(color=colors[i], width=3),
-            marker=dict(size=6)
-        ))
-
-    if germany:
-        df_g = df_top10[df_top10['Geopolitical entity (reporting)'] == germany[0]]
-        fig_waste.add_trace(go.Scatter(
-            x=df_g['TIME_PERIOD'],
-            y=df_g['OBS_VALUE'],
-            mode='lines+markers',
-            name='Germany',
-            line=dict(color='crimson', width=3),
-            marker=dict(size=6, symbol='circle')
-        ))
-
-    grey = ['#cccccc', '#bbbbbb', '#aaaaaa', '#999999', '#888888', '#777777']
-    for i, country in enumerate(rest):
-        df_c = df_top10[df_top10['Geopolitical entity (reporting)'] == country]
-        fig_waste.add_trace(go.Scatter(
-            x=df_c['TIME_PERIOD'],
-            y=df_c['OBS_VALUE'],
-            mode='lines',
-            name=country,
-            line=dict(color=grey[i % len(grey)], width=1.5)
-        ))
-
-    fig_waste.update_layout(
-        title='Top 10 Countries: Municipal Waste Generation (Last 20 Years)',
-        xaxis_title='Year',
-        yaxis_title='Waste per Capita (Kilograms)',
-        yaxis=dict(rangemode='tozero'),
-        template='plotly_white',
-        legend_title='Country',
-        hovermode='x unified'
-    )
-
-    st.plotly_chart(fig_waste, use_container_width=True)
+    submit_chart("Municipal waste generation", ce_charts.top10_lines,
+                 load_data("municipal_waste_per_capita"), 20,
+                 title='Top 10 Countries: Municipal Waste Generation (Last 20 Years)',
+                 yaxis_title='Waste per Capita (Kilograms)')
 
     # --- Municipal Waste Recycling Rate Chart ---
-    df_municipal_waste_recycle = pd.read_csv("./Dataset_CE/Recycling_rate_of_municipal_waste.csv")
-    df_municipal_waste_recycle = df_municipal_waste_recycle[
-        df_municipal_waste_recycle['Geopolitical entity (reporting)'] != 'European Union - 27 countries (from 2020)'
-    ]
-    last_10_years = sorted(df_municipal_waste_recycle['TIME_PERIOD'].unique())[-10:]
-    df_recent = df_municipal_waste_recycle[df_municipal_waste_recycle['TIME_PERIOD'].isin(last_10_years)]
-
-    country_totals = df_recent.groupby('Geopolitical entity (reporting)')['OBS_VALUE'].sum().sort_values(ascending=False)
-    top10_countries = country_totals.head(10).index.tolist()
-
-    germany_entry = [c for c in top10_countries if "Germany" in c]
-    is_germany_in_top10 = bool(germany_entry)
-    germany_name = germany_entry[0] if is_germany_in_top10 else None
-
-    top10_excluding_germany = [c for c in top10_countries if c != germany_name]
-    top2_others = top10_excluding_germany[:2]
-    rest = top10_excluding_germany[2:]
-
-    df_top10 = df_recent[df_recent['Geopolitical entity (reporting)'].isin(top10_countries)]
-
-    fig_recycle = go.Figure()
-
-    if is_germany_in_top10:
-        df_germany = df_top10[df_top10['Geopolitical entity (reporting)'] == germany_name]
-        fig_recycle.add_trace(go.Scatter(
-            x=df_germany['TIME_PERIOD'],
-            y=df_germany['OBS_VALUE'],
-            mode='lines+markers',
-            name='Germany',
-            line=dict(color='crimson', width=3),
-            marker=dict(size=6, symbol='circle')
-        ))
-
-    top2_colors = ['#1f77b4', '#2a9fd6']
-    for i, country in enumerate(top2_others):
-        df_country = df_top10[df_top10['Geopolitical entity (reporting)'] == country]
-        fig_recycle.add_trace(go.Scatter(
-            x=df_country['TIME_PERIOD'],
-            y=df_country['OBS_VALUE'],
-            mode='lines+markers',
-            name=country,
-            line=dict(color=top2_colors[i], width=3),
-            marker=dict(size=6)
-        ))
-
-    grey_shades = ['#cccccc', '#bbbbbb', '#aaaaaa', '#999999']
-    for i, country in enumerate(rest):
-        df_country = df_top10[df_top10['Geopolitical entity (reporting)'] == country]
-        fig_recycle.add_trace(go.Scatter(
-            x=df_country['TIME_PERIOD'],
-            y=df_country['OBS_VALUE'],
-            mode='lines',
-            name=country,
-            line=dict(color=grey_shades[i % len(grey_shades)], width=1.5),
-            showlegend=True
-        ))
-
-    fig_recycle.update_layout(
-        title='Top 10 Countries: Municipal Waste Recycling Rate (Last 10 Years)',
-        xaxis_title='Year',
-        yaxis_title='Recycling Rate (%)',
-        yaxis=dict(rangemode='tozero'),
-        template='plotly_white',
-        legend_title='Country',
-        hovermode='x unified'
-    )
-
-    st.plotly_chart(fig_recycle, use_container_width=True)
+    submit_chart("Municipal waste recycling", ce_charts.top10_recycling_lines,
+                 load_data("Recycling_rate_of_municipal_waste"), 10,
+                 title='Top 10 Countries: Municipal Waste Recycling Rate (Last 10 Years)',
+                 yaxis_title='Recycling Rate (%)')
 
 with tab5:
     st.header("🖥️ Waste Electrical and Electronic Equipment (WEEE)")
@@ -488,80 +247,11 @@ with tab5:
 
     st.markdown("### 🔁 Tracking WEEE Collection & Recycling Over Time")
 
-    df_weee_recycle = pd.read_csv("./Dataset_CE/Recycling rate of WEEE separately collected.csv")
-
-    # Filter the last 10 years
-    last_20_years = sorted(df_weee_recycle['TIME_PERIOD'].unique())[-20:]
-    df_recent = df_weee_recycle[df_weee_recycle['TIME_PERIOD'].isin(last_20_years)]
-
-    # Group by country and sum WEEE recycled over last 10 years
-    country_totals = df_recent.groupby('Geopolitical entity (reporting)')['OBS_VALUE'].sum().sort_values(ascending=False)
-
-    # Get top 10 countries
-    top10_countries = country_totals.head(10).index.tolist()
-    top3 = top10_countries[:3]
-    rest = top10_countries[3:]
-
-    # Check if Germany is in top 10
-    germany_entry = [c for c in top10_countries if "Germany" in c]
-    rest_except_germany = [c for c in rest if c != germany_entry[0]] if germany_entry else rest
-
-    # Filter data only for top 10 countries
-    df_top10 = df_recent[df_recent['Geopolitical entity (reporting)'].isin(top10_countries)]
-
-    # Create figure
-    fig_weee = go.Figure()
-
-    # Add top 3 countries with shades of blue
-    top3_colors = ['#1f77b4', '#2a9fd6', '#99ccff']
-    for i, country in enumerate(top3):
-        df_country = df_top10[df_top10['Geopolitical entity (reporting)'] == country]
-        fig_weee.add_trace(go.Scatter(
-            x=df_country['TIME_PERIOD'],
-            y=df_country['OBS_VALUE'],
-            mode='lines+markers',
-            name=country,
-            line=dict(color=top3_colors[i], width=3),
-            marker=dict(size=6)
-        ))
-
-    # Add Germany with a distinct color (red)
-    if germany_entry:
-        df_germany = df_top10[df_top10['Geopolitical entity (reporting)'] == germany_entry[0]]
-        fig_weee.add_trace(go.Scatter(
-            x=df_germany['TIME_PERIOD'],
-            y=df_germany['OBS_VALUE'],
-            mode='lines+markers',
-            name='Germany',
-            line=dict(color='crimson', width=3),
-            marker=dict(size=6, symbol='circle')
-        ))
-
-    # Add remaining countries with subtle grey gradient
-    grey_shades = ['#cccccc', '#bbbbbb', '#aaaaaa', '#999999', '#888888', '#777777']
-    for i, country in enumerate(rest_except_germany):
-        df_country = df_top10[df_top10['Geopolitical entity (reporting)'] == country]
-        fig_weee.add_trace(go.Scatter(
-            x=df_country['TIME_PERIOD'],
-            y=df_country['OBS_VALUE'],
-            mode='lines',
-            name=country,
-            line=dict(color=grey_shades[i % len(grey_shades)], width=1.5),
-            showlegend=True
-        ))
-
-    # Layout customization
-    fig_weee.update_layout(
-        title='Top 10 Countries: WEEE Recycling Rate',
-        xaxis_title='Year',
-        yaxis_title='WEEE Recycling Rate (%)',
-        yaxis=dict(range=[60, 100]),
-        template='plotly_white',
-        legend_title='Country',
-        hovermode='x unified'
-    )
-
-    st.plotly_chart(fig_weee, use_container_width=True)
+    submit_chart("WEEE recycling", ce_charts.top10_lines,
+                 load_data("Recycling rate of WEEE separately collected"), 20,
+                 title='Top 10 Countries: WEEE Recycling Rate',
+                 yaxis_title='WEEE Recycling Rate (%)',
+                 yaxis=dict(range=[60, 100]))
 
 with tab6:
     st.header("♻️ Circular Material Use Rate")
@@ -586,90 +276,9 @@ with tab6:
     with col4:
         st.metric(label="EU Target (2030)", value="Increase significantly 🚀")
 
-    # Load and clean the dataset
-    df_circular_mtl_use = pd.read_csv("./Dataset_CE/Circular_material_use_rate.csv")
-    df_circular_mtl_use = df_circular_mtl_use[['Geopolitical entity (reporting)', 'TIME_PERIOD', 'OBS_VALUE']].dropna()
-
-    # Keep only the latest year
-    latest_year = df_circular_mtl_use['TIME_PERIOD'].max()
-    df_latest = df_circular_mtl_use[df_circular_mtl_use['TIME_PERIOD'] == latest_year].copy()
-
-    # Rename and map country names
-    df_latest.rename(columns={
-        'Geopolitical entity (reporting)': 'Country',
-        'OBS_VALUE': 'Circular Material Use Rate (%)'
-    }, inplace=True)
-
-    country_name_map = {
-        "Czechia": "Czech Republic",
-        "EU27_2020": "European Union"
-    }
-    df_latest['Country'] = df_latest['Country'].replace(country_name_map)
-
-    # Choropleth map
-    fig_choropleth = px.choropleth(
-        df_latest,
-        locations="Country",
-        locationmode="country names",
-        color="Circular Material Use Rate (%)",
-        hover_name="Country",
-        color_continuous_scale="Viridis",
-        title=f"Circular Material Use Rate by Country ({latest_year})",
-        template="plotly_white"
-    )
-
-    fig_choropleth.update_geos(
-        showcoastlines=True,
-        showland=True,
-        showcountries=True,
-        fitbounds=False,
-        projection_type="natural earth"
-    )
-
-    fig_choropleth.update_layout(
-        margin={"r": 0, "t": 50, "l": 0, "b": 0},
-        geo=dict(bgcolor="rgba(0,0,0,0)")
-    )
-
-    st.plotly_chart(fig_choropleth, use_container_width=True)
-
-    # Animated bar chart: Top 10 countries over last 20 years
-    df = df_circular_mtl_use.copy()
-    df = df[df["Geopolitical entity (reporting)"] != "European Union - 27 countries (from 2020)"]
-
-    df["TIME_PERIOD"] = pd.to_numeric(df["TIME_PERIOD"], errors='coerce')
-    df["OBS_VALUE"] = pd.to_numeric(df["OBS_VALUE"], errors='coerce')
-
-    recent_years = sorted(df["TIME_PERIOD"].dropna().unique())[-20:]
-    df = df[df["TIME_PERIOD"].isin(recent_years)]
-
-    df_top10 = df.groupby("TIME_PERIOD").apply(lambda x: x.nlargest(10, "OBS_VALUE")).reset_index(drop=True)
-
-    fig_bar_animated = px.bar(
-        df_top10,
-        x="OBS_VALUE",
-        y="Geopolitical entity (reporting)",
-        color="Geopolitical entity (reporting)",
-        orientation='h',
-        animation_frame="TIME_PERIOD",
-        range_x=[0, df_top10["OBS_VALUE"].max() * 1.1],
-        title="Top 10 Countries: Circular Material Use Rate",
-        labels={
-            "OBS_VALUE": "Circular Use Rate (%)",
-            "Geopolitical entity (reporting)": "Country"
-        },
-        template="plotly_white"
-    )
-    fig_bar_animated.update_layout(
-        yaxis={'categoryorder': 'total ascending'},
-        xaxis_title="Circular Use Rate (%)",
-        yaxis_title="Country",
-        legend_title="Country",
-        transition={'duration': 500},
-        hovermode="closest"
-    )
-
-    st.plotly_chart(fig_bar_animated, use_container_width=True)
+    # Choropleth map and animated bar chart: Top 10 countries over last 20 years
+    submit_chart("CMU rate map", ce_charts.cmu_choropleth, load_data("Circular_material_use_rate"))
+    submit_chart("CMU rate top 10", ce_charts.cmu_top10_bar, load_data("cmu_top10_per_year"))
 
 with tab7:
     st.header("📦 Material Import Dependency-How much do we rely on foreign materials?")
@@ -697,50 +306,35 @@ with tab7:
 
     st.markdown("### 🔄 Top 10 Material Import Dependent Countries Over Time")
 
-    # Load and clean data
-    df_mtl_dep = pd.read_csv("./Dataset_CE/Material import dependency.csv")
-    df_mtl_dep = df_mtl_dep[~df_mtl_dep['Geopolitical entity (reporting)'].str.contains("European Union", na=False)]
-    df_mtl_dep = df_mtl_dep.dropna(subset=['OBS_VALUE'])
-    df_mtl_dep = df_mtl_dep[df_mtl_dep['TIME_PERIOD'] >= 2003]
-
-    # Compute top 10 countries for each year independently
-    df_top10_dynamic = df_mtl_dep.groupby('TIME_PERIOD', group_keys=False).apply(
-        lambda g: g.nlargest(10, 'OBS_VALUE')
-    ).reset_index(drop=True)
-
     # Animated bubble chart
-    fig = px.scatter(
-        df_top10_dynamic,
-        x='Geopolitical entity (reporting)',
-        y='OBS_VALUE',
-        size='OBS_VALUE',
-        color='Geopolitical entity (reporting)',
-        animation_frame='TIME_PERIOD',
-        animation_group='Geopolitical entity (reporting)',
-        size_max=60,
-        range_y=[0, df_top10_dynamic['OBS_VALUE'].max() + 10],
-        title='🔄 Material Import Dependency — Top 10 Countries (Dynamic by Year)',
-        labels={
-            'OBS_VALUE': 'Material Import Dependency (%)',
-            'Geopolitical entity (reporting)': 'Country'
-        },
-        template='plotly_white'
-    )
+    submit_chart("Material import dependency", ce_charts.import_dependency_bubbles,
+                 load_data("import_dependency_top10_per_year"))
 
-    # Smooth transition settings
-    fig.layout.updatemenus[0].buttons[0].args[1]['frame']['duration'] = 700  # Animation speed
-    fig.layout.updatemenus[0].buttons[0].args[1]['transition']['duration'] = 500
+with tab8:
+    st.header("🇪🇺 Country vs EU: All Indicators at a Glance")
+
+    st.markdown("""
+    Pick a country to compare it with the **EU27_2020 aggregate** on every circular economy indicator in the dashboard,
+    from waste generation and recycling rates to material use, emissions and circular economy jobs and investment.
+    """)
 
-    fig.update_layout(
-        xaxis_title='Country',
-        yaxis_title='Import Dependency (%)',
-        showlegend=False,
-        height=600
+    # Wide (geo, year) x indicator panel, built once by ce_pipeline and cached
+    panel = load_data("indicator_panel")
+    geo_names = load_data("geo_names")
+    countries = [g for g in panel.index.unique('geo') if not geo_names.at[g, 'is_aggregate']]
+    geo = st.selectbox(
+        "Country",
+        countries,
+        index=countries.index("DE"),
+        format_func=lambda g: geo_names.at[g, ce_charts.COUNTRY]
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    # One indexed lookup returns every indicator for both regions
+    comparison = panel.loc[[geo, "EU27_2020"]]
+    submit_chart("Country vs EU", ce_charts.country_vs_eu_small_multiples,
+                 comparison, geo, geo_names.at[geo, ce_charts.COUNTRY])
 
-with tab8:
+with tab9:
     st.header("🔑 Key Takeaways from the Project")
 
     # Main column layout
@@ -783,3 +377,12 @@ with tab8:
         st.markdown("""
         > 🌟 *"Closing the loop isn't just good for the planet — it's a smarter, more sustainable way to grow economies and empower future generations."*
         """)
+
+# Fill the chart slots in completion order
+for future in as_completed(pending_charts):
+    name, slot = pending_charts[future]
+    slot.plotly_chart(future.result(), use_container_width=True)
+
+if show_payload_stats:
+    st.sidebar.markdown("### 📦 Chart payloads")
+    st.sidebar.dataframe(pd.DataFrame(chart_stats).set_index("chart"))
@@ -0,0 +1,358 @@
+"""Data preparation and figure building for the dashboard charts.
+
+Each function takes a cleaned table or a prepared aggregate from
+``ce_pipeline.artifact`` and returns a plotly figure. They do not touch
+Streamlit, so ``ce_app.py`` can run them on a worker pool and place the
+results into their slots as they finish.
+"""
+
+import math
+
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from ce_pipeline import COUNTRY, PANEL_INDICATORS, recent
+
+TOP3_COLORS = ['#1f77b4', '#2a9fd6', '#99ccff']
+GREY_SHADES = ['#cccccc', '#bbbbbb', '#aaaaaa', '#999999', '#888888', '#777777']
+
+# Play / Pause buttons for the animated bar charts
+ANIMATION_BUTTONS = [{
+    'buttons': [
+        {'args': [None, {'frame': {'duration': 1000, 'redraw': True}, 'fromcurrent': True}],
+        'label': 'Play',
+        'method': 'animate'},
+        {'args': [[None], {'frame': {'duration': 0, 'redraw': False}, 'mode': 'immediate'}],
+        'label': 'Pause',
+        'method': 'animate'}
+    ],
+    'direction': 'left',
+    'pad': {'r': 10, 't': 87},
+    'showactive': False,
+    'type': 'buttons',
+    'x': 0.1,
+    'xanchor': 'right',
+    'y': 0,
+    'yanchor': 'top'
+}]
+
+
+def top_waste_generators_bar(top10_per_year):
+    """Animated bar chart of the top 10 waste generators per year (last 20 years).
+
+    Takes the ``total_waste_top10_per_year`` artifact.
+    """
+    fig = px.bar(
+        top10_per_year,
+        x='country',
+        y='OBS_VALUE',
+        color='country',
+        animation_frame='year',
+        title='Top 10 Waste-Generating Countries in Europe (Last 20 Years)',
+        labels={'OBS_VALUE': 'Waste Generated (Kilograms percapita)', 'country': 'Country'},
+        template='plotly_white'
+    )
+
+    # Adjust animation speed and layout
+    fig.update_layout(
+        xaxis={'categoryorder': 'total descending'},
+        yaxis_title='Waste Generated (in Kilograms per capita)',
+        xaxis_title='Country',
+        transition={'duration': 1000},  # 1 second per frame
+        updatemenus=ANIMATION_BUTTONS
+    )
+    return fig
+
+
+def top10_lines(df, n_years, yaxis_title, title=None, yaxis=None):
+    """Line chart of the 10 countries with the highest totals over the last ``n_years``.
+
+    The top 3 are drawn in shades of blue, Germany in crimson and the rest in grey.
+    """
+    df_recent = recent(df, n_years)
+
+    country_totals = df_recent.groupby(COUNTRY)['OBS_VALUE'].sum().sort_values(ascending=False)
+    top10_countries = country_totals.head(10).index.tolist()
+    top3 = top10_countries[:3]
+    rest = top10_countries[3:]
+
+    germany_entry = [c for c in top10_countries if "Germany" in c]
+    rest_except_germany = [c for c in rest if c != germany_entry[0]] if germany_entry else rest
+
+    df_top10 = df_recent[df_recent[COUNTRY].isin(top10_countries)]
+
+    fig = go.Figure()
+
+    for i, country in enumerate(top3):
+        df_country = df_top10[df_top10[COUNTRY] == country]
+        fig.add_trace(go.Scatter(
+            x=df_country['TIME_PERIOD'],
+            y=df_country['OBS_VALUE'],
+            mode='lines+markers',
+            name=country,
+            line=dict(color=TOP3_COLORS[i], width=3),
+            marker=dict(size=6)
+        ))
+
+    if germany_entry:
+        df_germany = df_top10[df_top10[COUNTRY] == germany_entry[0]]
+        fig.add_trace(go.Scatter(
+            x=df_germany['TIME_PERIOD'],
+            y=df_germany['OBS_VALUE'],
+            mode='lines+markers',
+            name='Germany',
+            line=dict(color='crimson', width=3),
+            marker=dict(size=6, symbol='circle')
+        ))
+
+    for i, country in enumerate(rest_except_germany):
+        df_country = df_top10[df_top10[COUNTRY] == country]
+        fig.add_trace(go.Scatter(
+            x=df_country['TIME_PERIOD'],
+            y=df_country['OBS_VALUE'],
+            mode='lines',
+            name=country,
+            line=dict(color=GREY_SHADES[i % len(GREY_SHADES)], width=1.5),
+            showlegend=True
+        ))
+
+    layout = dict(
+        xaxis_title='Year',
+        yaxis_title=yaxis_title,
+        yaxis=yaxis or dict(rangemode='tozero'),
+        template='plotly_white',
+        legend_title='Country',
+        hovermode='x unified'
+    )
+    if title:
+        layout['title'] = title
+    fig.update_layout(**layout)
+    return fig
+
+
+def top10_recycling_lines(df, n_years, title, yaxis_title):
+    """Like ``top10_lines`` for rates: Germany first, then the top 2 others in blue.
+
+    Aggregates are left out so the EU average does not take a top-10 place.
+    """
+    df = df[~df['is_aggregate']]
+    df_recent = recent(df, n_years)
+
+    country_totals = df_recent.groupby(COUNTRY)['OBS_VALUE'].sum().sort_values(ascending=False)
+    top10_countries = country_totals.head(10).index.tolist()
+
+    germany_entry = [c for c in top10_countries if "Germany" in c]
+    is_germany_in_top10 = bool(germany_entry)
+    germany_name = germany_entry[0] if is_germany_in_top10 else None
+
+    top10_excluding_germany = [c for c in top10_countries if c != germany_name]
+    top2_others = top10_excluding_germany[:2]
+    rest = top10_excluding_germany[2:]
+
+    df_top10 = df_recent[df_recent[COUNTRY].isin(top10_countries)]
+
+    fig = go.Figure()
+
+    if is_germany_in_top10:
+        df_germany = df_top10[df_top10[COUNTRY] == germany_name]
+        fig.add_trace(go.Scatter(
+            x=df_germany['TIME_PERIOD'],
+            y=df_germany['OBS_VALUE'],
+            mode='lines+markers',
+            name='Germany',
+            line=dict(color='crimson', width=3),
+            marker=dict(size=6, symbol='circle')
+        ))
+
+    for i, country in enumerate(top2_others):
+        df_country = df_top10[df_top10[COUNTRY] == country]
+        fig.add_trace(go.Scatter(
+            x=df_country['TIME_PERIOD'],
+            y=df_country['OBS_VALUE'],
+            mode='lines+markers',
+            name=country,
+            line=dict(color=TOP3_COLORS[i], width=3),
+            marker=dict(size=6)
+        ))
+
+    grey_shades = GREY_SHADES[:4]
+    for i, country in enumerate(rest):
+        df_country = df_top10[df_top10[COUNTRY] == country]
+        fig.add_trace(go.Scatter(
+            x=df_country['TIME_PERIOD'],
+            y=df_country['OBS_VALUE'],
+            mode='lines',
+            name=country,
+            line=dict(color=grey_shades[i % len(grey_shades)], width=1.5),
+            showlegend=True
+        ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title='Year',
+        yaxis_title=yaxis_title,
+        yaxis=dict(rangemode='tozero'),
+        template='plotly_white',
+        legend_title='Country',
+        hovermode='x unified'
+    )
+    return fig
+
+
+def cmu_choropleth(df_circular_mtl_use):
+    """Map of the circular material use rate in the latest year."""
+    # Keep only the latest year
+    latest_year = df_circular_mtl_use['TIME_PERIOD'].max()
+    df_latest = df_circular_mtl_use.loc[
+        df_circular_mtl_use['TIME_PERIOD'] == latest_year, [COUNTRY, 'TIME_PERIOD', 'OBS_VALUE']
+    ]
+
+    # Rename and map country names
+    df_latest = df_latest.rename(columns={
+        COUNTRY: 'Country',
+        'OBS_VALUE': 'Circular Material Use Rate (%)'
+    })
+
+    country_name_map = {
+        "Czechia": "Czech Republic",
+        "EU27_2020": "European Union"
+    }
+    df_latest['Country'] = df_latest['Country'].replace(country_name_map)
+
+    fig = px.choropleth(
+        df_latest,
+        locations="Country",
+        locationmode="country names",
+        color="Circular Material Use Rate (%)",
+        hover_name="Country",
+        color_continuous_scale="Viridis",
+        title=f"Circular Material Use Rate by Country ({latest_year})",
+        template="plotly_white"
+    )
+
+    fig.update_geos(
+        showcoastlines=True,
+        showland=True,
+        showcountries=True,
+        fitbounds=False,
+        projection_type="natural earth"
+    )
+
+    fig.update_layout(
+        margin={"r": 0, "t": 50, "l": 0, "b": 0},
+        geo=dict(bgcolor="rgba(0,0,0,0)")
+    )
+    return fig
+
+
+def cmu_top10_bar(df_top10):
+    """Animated bar chart: top 10 countries by circular material use rate (last 20 years).
+
+    Takes the ``cmu_top10_per_year`` artifact.
+    """
+    fig = px.bar(
+        df_top10,
+        x="OBS_VALUE",
+        y=COUNTRY,
+        color=COUNTRY,
+        orientation='h',
+        animation_frame="TIME_PERIOD",
+        range_x=[0, df_top10["OBS_VALUE"].max() * 1.1],
+        title="Top 10 Countries: Circular Material Use Rate",
+        labels={
+            "OBS_VALUE": "Circular Use Rate (%)",
+            COUNTRY: "Country"
+        },
+        template="plotly_white"
+    )
+    fig.update_layout(
+        yaxis={'categoryorder': 'total ascending'},
+        xaxis_title="Circular Use Rate (%)",
+        yaxis_title="Country",
+        legend_title="Country",
+        transition={'duration': 500},
+        hovermode="closest"
+    )
+    return fig
+
+
+def import_dependency_bubbles(df_top10_dynamic):
+    """Animated bubble chart of the 10 most import-dependent countries per year.
+
+    Takes the ``import_dependency_top10_per_year`` artifact (2003 onwards).
+    """
+    fig = px.scatter(
+        df_top10_dynamic,
+        x=COUNTRY,
+        y='OBS_VALUE',
+        size='OBS_VALUE',
+        color=COUNTRY,
+        animation_frame='TIME_PERIOD',
+        animation_group=COUNTRY,
+        size_max=60,
+        range_y=[0, df_top10_dynamic['OBS_VALUE'].max() + 10],
+        title='🔄 Material Import Dependency — Top 10 Countries (Dynamic by Year)',
+        labels={
+            'OBS_VALUE': 'Material Import Dependency (%)',
+            COUNTRY: 'Country'
+        },
+        template='plotly_white'
+    )
+
+    # Smooth transition settings
+    fig.layout.updatemenus[0].buttons[0].args[1]['frame']['duration'] = 700  # Animation speed
+    fig.layout.updatemenus[0].buttons[0].args[1]['transition']['duration'] = 500
+
+    fig.update_layout(
+        xaxis_title='Country',
+        yaxis_title='Import Dependency (%)',
+        showlegend=False,
+        height=600
+    )
+    return fig
+
+
+def country_vs_eu_small_multiples(comparison, geo, country_name, cols=4):
+    """One small line chart per indicator: ``geo`` in crimson against the EU27_2020 aggregate.
+
+    ``comparison`` is the ``indicator_panel`` artifact looked up for both regions,
+    ``panel.loc[[geo, "EU27_2020"]]``. Each indicator keeps its own y-axis.
+    """
+    indicators = list(comparison.columns)
+    rows = math.ceil(len(indicators) / cols)
+    fig = make_subplots(
+        rows=rows,
+        cols=cols,
+        subplot_titles=[PANEL_INDICATORS[i][2] for i in indicators],
+        horizontal_spacing=0.05,
+        vertical_spacing=0.25 / rows
+    )
+
+    regions = [(geo, country_name, 'crimson'), ("EU27_2020", 'EU27_2020', TOP3_COLORS[0])]
+    present = set(comparison.index.get_level_values('geo'))
+    for k, indicator in enumerate(indicators):
+        row, col = divmod(k, cols)
+        for region, name, color in regions:
+            if region not in present:
+                continue
+            series = comparison.loc[region, indicator].dropna()
+            fig.add_trace(go.Scatter(
+                x=series.index,
+                y=series.values,
+                mode='lines',
+                name=name,
+                legendgroup=name,
+                showlegend=k == 0,
+                line=dict(color=color, width=2)
+            ), row=row + 1, col=col + 1)
+
+    fig.update_annotations(font_size=12)
+    fig.update_layout(
+        title=f'{country_name} vs EU27_2020 across all indicators',
+        template='plotly_white',
+        height=230 * rows,
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+        margin=dict(t=100)
+    )
+    return fig
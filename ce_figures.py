@@ -0,0 +1,218 @@
+"""Compact serialization of the dashboard's plotly figures.
+
+Every rerun sends each chart to the browser as JSON. ``compact_figure`` shrinks
+that payload without changing what is drawn:
+
+- float arrays are rounded to the data's real precision (Eurostat publishes one
+  decimal for most indicators) and sent as short JSON numbers; whole-number
+  arrays are sent as integers, which plotly packs into small binary typed arrays;
+- line charts whose subplot draws at least ``WEBGL_MIN_POINTS`` points switch
+  from ``scatter`` to ``scattergl``. WebGL only pays off for large point counts,
+  and every WebGL chart takes one of the browser's few WebGL contexts, so the
+  dashboard's ~20-point line charts stay SVG;
+- per-trace fields that only restate plotly defaults are dropped, and in
+  animated charts every field that is identical in the base trace and in all
+  frames is sent once instead of once per frame.
+
+``payload_stats`` measures bytes on the wire and encode time before and after.
+JSON encoding uses ``orjson`` when it is installed (plotly's fast engine).
+"""
+
+import base64
+import math
+import time
+from collections import Counter
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+import plotly.tools
+
+try:
+    import orjson  # noqa: F401
+    JSON_ENGINE = "orjson"
+except ImportError:
+    JSON_ENGINE = "json"
+
+pio.json.config.default_engine = JSON_ENGINE
+
+# Subplots drawing at least this many points (over all their line traces) use WebGL
+WEBGL_MIN_POINTS = 5000
+MAX_DECIMALS = 6
+
+# Trace fields whose value equals the plotly.js default (trace type -> path -> value)
+_DEFAULTS = {
+    None: {("showlegend",): True},
+    "scatter": {("marker", "symbol"): "circle", ("marker", "size"): 6},
+    "scattergl": {("marker", "symbol"): "circle", ("marker", "size"): 6},
+}
+
+
+def infer_decimals(values, max_decimals=MAX_DECIMALS):
+    """Smallest number of decimals that represents every value exactly."""
+    values = np.asarray(values, dtype="float64")
+    values = values[np.isfinite(values)]
+    for d in range(max_decimals + 1):
+        if np.allclose(values, np.round(values, d), rtol=0, atol=1e-9):
+            return d
+    return max_decimals
+
+
+def _as_float_array(obj):
+    """``obj`` as a float ndarray if it is one (plain or plotly's base64 form), else None."""
+    if isinstance(obj, np.ndarray):
+        return obj if obj.dtype.kind == "f" else None
+    if isinstance(obj, dict) and "bdata" in obj and str(obj.get("dtype", "")).startswith("f"):
+        array = np.frombuffer(base64.b64decode(obj["bdata"]), dtype=obj["dtype"])
+        if "shape" in obj:
+            array = array.reshape([int(n) for n in str(obj["shape"]).split(",")])
+        return array
+    if isinstance(obj, (list, tuple)) and obj and all(isinstance(v, float) for v in obj):
+        return np.asarray(obj, dtype="float64")
+    return None
+
+
+def _float_arrays(obj):
+    """Yield every float array nested in a trace dict."""
+    array = _as_float_array(obj)
+    if array is not None:
+        yield array
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            yield from _float_arrays(value)
+
+
+def _round_arrays(obj, decimals):
+    array = _as_float_array(obj)
+    if array is not None:
+        rounded = np.round(array, decimals)
+        if decimals == 0 and np.isfinite(rounded).all():
+            return rounded.astype("int64")
+        if rounded.ndim > 1:
+            return [[None if math.isnan(v) else v for v in row] for row in rounded.tolist()]
+        return [None if math.isnan(v) else v for v in rounded.tolist()]
+    if isinstance(obj, dict):
+        return {k: _round_arrays(v, decimals) for k, v in obj.items()}
+    return obj
+
+
+def _drop_defaults(trace):
+    for trace_type in (None, trace.get("type")):
+        for path, default in _DEFAULTS.get(trace_type, {}).items():
+            *parents, leaf = path
+            node = trace
+            for key in parents:
+                node = node.get(key)
+                if not isinstance(node, dict):
+                    break
+            else:
+                if leaf in node and _same(node[leaf], default):
+                    del node[leaf]
+                    if parents and not node:
+                        del trace[parents[0]]
+
+
+def _n_points(trace):
+    x = trace.get("x")
+    if isinstance(x, dict) and "bdata" in x:
+        return len(base64.b64decode(x["bdata"])) // np.dtype(x["dtype"]).itemsize
+    return 0 if x is None else len(x)
+
+
+def _same(a, b):
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return (
+            isinstance(a, np.ndarray) and isinstance(b, np.ndarray)
+            and a.dtype == b.dtype and np.array_equal(a, b)
+        )
+    return type(a) is type(b) and a == b
+
+
+def _drop_constant_frame_fields(base, frame_traces):
+    """Remove fields that never change across frames (plotly merges frames into traces)."""
+    if not frame_traces:
+        return
+    for key in base:
+        if key == "type" or not all(key in t for t in frame_traces):
+            continue
+        if isinstance(base[key], dict) and "bdata" not in base[key]:
+            if all(isinstance(t[key], dict) for t in frame_traces):
+                _drop_constant_frame_fields(base[key], [t[key] for t in frame_traces])
+                for t in frame_traces:
+                    if not t[key]:
+                        del t[key]
+        elif all(_same(t[key], base[key]) for t in frame_traces):
+            for t in frame_traces:
+                del t[key]
+
+
+def compact_figure(fig, decimals=None, webgl_min_points=WEBGL_MIN_POINTS):
+    """Return a compact copy of ``fig`` for ``st.plotly_chart``."""
+    # Per-object copies keep plain numpy arrays (Figure.to_dict base64-encodes them all)
+    data = [trace.to_plotly_json() for trace in fig.data]
+    frames = [frame.to_plotly_json() for frame in fig.frames]
+    spec = {"data": data, "layout": fig.layout.to_plotly_json()}
+    if frames:
+        spec["frames"] = frames
+    traces = data + [t for frame in frames for t in frame.get("data", [])]
+
+    if decimals is None:
+        arrays = [a for t in traces for a in _float_arrays(t)]
+        decimals = infer_decimals(np.concatenate([a.ravel() for a in arrays])) if arrays else MAX_DECIMALS
+
+    if not frames:
+        def subplot(t):
+            return t.get("xaxis", "x"), t.get("yaxis", "y")
+        points = Counter()
+        for t in data:
+            if t.get("type") == "scatter":
+                points[subplot(t)] += _n_points(t)
+        for t in data:
+            if t.get("type") == "scatter" and points[subplot(t)] >= webgl_min_points:
+                t["type"] = "scattergl"
+
+    for i, trace in enumerate(data):
+        _drop_constant_frame_fields(
+            trace, [f["data"][i] for f in frames if i < len(f.get("data", []))]
+        )
+    # Only base traces: a frame value equal to the default may be resetting the base
+    for trace in data:
+        _drop_defaults(trace)
+
+    spec["data"] = [_round_arrays(t, decimals) for t in data]
+    for frame in frames:
+        frame["data"] = [_round_arrays(t, decimals) for t in frame.get("data", [])]
+    # The spec comes from an already validated figure, so skip plotly's
+    # re-validation (the same shortcut plotly uses when loading templates);
+    # st.plotly_chart does not validate Figure objects again either.
+    return go.Figure(spec, _validate=False)
+
+
+def _encode(fig):
+    # Same steps as st.plotly_chart (dicts are validated into a Figure first)
+    start = time.perf_counter()
+    fig = plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True)
+    payload = pio.to_json(fig, validate=False, engine=JSON_ENGINE)
+    return len(payload.encode("utf-8")), (time.perf_counter() - start) * 1000
+
+
+def payload_stats(fig):
+    """Compact ``fig`` and measure bytes and encode time (ms) before and after.
+
+    Returns ``(compact, stats)`` so the measured figure is the one that is shown.
+    """
+    start = time.perf_counter()
+    compact = compact_figure(fig)
+    compact_ms = (time.perf_counter() - start) * 1000
+
+    before_bytes, before_ms = _encode(fig)
+    after_bytes, after_ms = _encode(compact)
+    return compact, {
+        "bytes_before": before_bytes,
+        "bytes_after": after_bytes,
+        "saved_%": round(100 * (1 - after_bytes / before_bytes), 1),
+        "encode_ms_before": round(before_ms, 2),
+        "encode_ms_after": round(after_ms, 2),
+        "compact_ms": round(compact_ms, 2),
+        "engine": JSON_ENGINE,
+    }
@@ -0,0 +1,230 @@
+"""Streaming ingest of Eurostat bulk downloads into the local columnar cache.
+
+Eurostat bulk files (``.tsv`` / ``.tsv.gz``) are wide: the first column packs the
+dimension codes (``freq,unit,geo\\TIME_PERIOD``) and every following column is a
+year whose cells hold the value and its flag together, e.g. ``"12.3 e"`` or
+``": c"``. This module reads such a dump chunk by chunk, melts each chunk to the
+long schema the dashboard uses (``geo``, ``TIME_PERIOD``, ``OBS_VALUE``,
+``OBS_FLAG`` plus the other dimension codes) and appends it to the cache as a new
+parquet part, so memory stays bounded by ``chunksize`` regardless of file size.
+The quality report is accumulated chunk by chunk as well
+(``ce_quality.ReportBuilder``): it keeps counters and one entry per series,
+never the rows themselves.
+
+The small SDMX-CSV extracts in ``Dataset_CE/`` go through the same cache via
+``ingest_sdmx_csv``. Both paths clean each table once with ``ce_quality`` and
+write a ``_quality.json`` report next to the parquet parts.
+
+Everything works on local paths; nothing is downloaded.
+
+Usage:
+    python ce_ingest.py estat_cei_wm011.tsv.gz --name cei_wm011
+    python ce_ingest.py --all          # (re)ingest every CSV in Dataset_CE/
+"""
+
+import argparse
+import glob
+import json
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+import ce_quality
+
+DATA_DIR = "./Dataset_CE"
+CACHE_DIR = "./Dataset_CE/cache"
+REPORT_FILE = "_quality.json"
+DEFAULT_CHUNKSIZE = 50_000
+
+# "12.3 e" -> value "12.3", flag "e";  ": c" -> value ":", flag "c";  "7" -> "7", ""
+_VALUE_FLAG_PATTERN = r"^\s*(?P<value>[^\s]*)\s*(?P<flag>[a-z]*)\s*$"
+
+
+def split_value_flag(cells):
+    """Split raw bulk cells into a float value Series and a string flag Series.
+
+    Eurostat writes missing values as ``:``; those become NaN while keeping their
+    flag (e.g. ``c`` for confidential).
+    """
+    parts = cells.str.extract(_VALUE_FLAG_PATTERN)
+    values = pd.to_numeric(parts["value"], errors="coerce")
+    flags = parts["flag"].fillna("")
+    return values.astype("float64"), flags.astype(str)
+
+
+def _parse_header(columns):
+    """Return (dimension names, {raw year column: int year}) for a bulk header."""
+    first = columns[0]
+    dims = first.split("\\")[0].split(",")
+    years = {}
+    for col in columns[1:]:
+        label = col.strip()
+        if not label.isdigit():
+            raise ValueError(
+                f"Only annual bulk files are supported, got time column {col!r}"
+            )
+        years[col] = int(label)
+    return dims, years
+
+
+def iter_bulk_tsv(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield long-format DataFrames from a (possibly compressed) bulk TSV file.
+
+    Compression is inferred from the file extension (``.gz``, ``.zip``, ...).
+    Rows whose value and flag are both empty are dropped; rows with a flag but no
+    value (``": c"``) are kept so ``ce_quality.normalize`` can count them by flag
+    for the quality report before it drops them.
+    """
+    reader = pd.read_csv(
+        path,
+        sep="\t",
+        dtype=str,
+        chunksize=chunksize,
+        compression="infer",
+        keep_default_na=False,
+    )
+    dims = years = None
+    for chunk in reader:
+        if dims is None:
+            dims, years = _parse_header(list(chunk.columns))
+        key_col = chunk.columns[0]
+
+        # Step 1: unpack the comma-joined dimension codes
+        keys = chunk[key_col].str.split(",", expand=True)
+        keys.columns = dims
+
+        # Step 2: melt the year columns to long format
+        wide = pd.concat([keys, chunk[list(years)]], axis=1)
+        long = wide.melt(id_vars=dims, var_name="TIME_PERIOD", value_name="cell")
+        long["TIME_PERIOD"] = long["TIME_PERIOD"].map(years).astype("int64")
+
+        # Step 3: separate value and flag
+        long["OBS_VALUE"], long["OBS_FLAG"] = split_value_flag(long.pop("cell"))
+        long = long[long["OBS_VALUE"].notna() | (long["OBS_FLAG"] != "")]
+
+        yield long.reset_index(drop=True)
+
+
+def cache_path(name, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, name)
+
+
+def append_to_cache(df, name, cache_dir=CACHE_DIR):
+    """Write ``df`` as the next parquet part of the cached dataset ``name``."""
+    target = cache_path(name, cache_dir)
+    os.makedirs(target, exist_ok=True)
+    n_parts = sum(1 for f in os.listdir(target) if f.endswith(".parquet"))
+    part = os.path.join(target, f"part-{n_parts:05d}.parquet")
+    df.to_parquet(part, index=False)
+    return part
+
+
+def clear_cache(name, cache_dir=CACHE_DIR):
+    target = cache_path(name, cache_dir)
+    if os.path.isdir(target):
+        for f in os.listdir(target):
+            if f.endswith(".parquet"):
+                os.remove(os.path.join(target, f))
+
+
+def cache_parts(name, cache_dir=CACHE_DIR):
+    return sorted(glob.glob(os.path.join(cache_path(name, cache_dir), "part-*.parquet")))
+
+
+def load_cache(name, cache_dir=CACHE_DIR, columns=None):
+    """Read every part of a cached dataset back as one DataFrame."""
+    return pd.read_parquet(cache_path(name, cache_dir), columns=columns)
+
+
+def report_path(name, cache_dir=CACHE_DIR):
+    # Leading underscore: parquet readers skip it when loading the directory
+    return os.path.join(cache_path(name, cache_dir), REPORT_FILE)
+
+
+def load_report(name, cache_dir=CACHE_DIR):
+    with open(report_path(name, cache_dir)) as f:
+        return json.load(f)
+
+
+def _finish(name, cache_dir, stats, builder):
+    report = builder.report(name, stats)
+    ce_quality.write_report(report, report_path(name, cache_dir))
+    return report
+
+
+def _resume_report(name, cache_dir):
+    """Report builder and ingest counters covering the parts already cached for ``name``.
+
+    Parts are scanned one at a time, reading only the report columns.
+    """
+    builder = ce_quality.ReportBuilder()
+    for part in cache_parts(name, cache_dir):
+        columns = ce_quality.report_columns(pq.read_schema(part).names)
+        builder.add(pd.read_parquet(part, columns=columns))
+    stats = {}
+    if os.path.exists(report_path(name, cache_dir)):
+        previous = load_report(name, cache_dir)
+        ce_quality.merge_stats(stats, {k: previous[k] for k in ce_quality.INGEST_COUNTERS if k in previous})
+    return builder, stats
+
+
+def ingest_bulk_tsv(path, name, cache_dir=CACHE_DIR, chunksize=DEFAULT_CHUNKSIZE, replace=True):
+    """Stream a bulk TSV dump into the cache and return its quality report.
+
+    Each chunk is cleaned with ``ce_quality.normalize`` and added to the report
+    before it is written. With ``replace=True`` (the default) existing parts of
+    ``name`` are removed first, so re-ingesting the same dump does not duplicate
+    rows. With ``replace=False`` the report still describes the whole cached
+    table: the existing parts and the previous report's counters are included.
+    """
+    if replace:
+        clear_cache(name, cache_dir)
+        builder, stats = ce_quality.ReportBuilder(), {}
+    else:
+        builder, stats = _resume_report(name, cache_dir)
+    for chunk in iter_bulk_tsv(path, chunksize=chunksize):
+        chunk, chunk_stats = ce_quality.normalize(chunk)
+        ce_quality.merge_stats(stats, chunk_stats)
+        builder.add(chunk)
+        if not chunk.empty:
+            append_to_cache(chunk, name, cache_dir)
+    return _finish(name, cache_dir, stats, builder)
+
+
+def ingest_sdmx_csv(path, name=None, cache_dir=CACHE_DIR):
+    """Clean one SDMX-CSV extract and store it as a single cached part."""
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    df, stats = ce_quality.normalize(pd.read_csv(path))
+    clear_cache(name, cache_dir)
+    append_to_cache(df, name, cache_dir)
+    return _finish(name, cache_dir, stats, ce_quality.ReportBuilder().add(df))
+
+
+def ingest_all(data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    return [ingest_sdmx_csv(path, cache_dir=cache_dir) for path in sorted(glob.glob(os.path.join(data_dir, "*.csv")))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest Eurostat data into the local cache.")
+    parser.add_argument("path", nargs="?", help="local .tsv or .tsv.gz bulk file")
+    parser.add_argument("--all", action="store_true", help=f"ingest every SDMX-CSV file in {DATA_DIR}")
+    parser.add_argument("--name", help="cache name (defaults to the file name without extensions)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--append", action="store_true", help="keep existing cached parts")
+    args = parser.parse_args()
+
+    if args.all:
+        reports = ingest_all(cache_dir=args.cache_dir)
+    elif args.path:
+        name = args.name or os.path.basename(args.path).split(".")[0]
+        reports = [ingest_bulk_tsv(args.path, name, args.cache_dir, args.chunksize, replace=not args.append)]
+    else:
+        parser.error("give a bulk file path or --all")
+
+    for report in reports:
+        print(
+            f"{report['dataset']}: {report['rows']} rows, "
+            f"{len(report['duplicate_keys'])} duplicate keys, {len(report['year_gaps'])} series with year gaps"
+        )
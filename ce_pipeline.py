@@ -0,0 +1,308 @@
+"""Shared, dependency-tracked preparation of the tables used by the app and notebooks.
+
+The pipeline is a small DAG of named stages. A stage is a function whose inputs
+are other stages (``deps``) and/or files (``sources``); its result is stored as
+a parquet artifact under ``Dataset_CE/cache/artifacts/`` named after the stage
+and a content hash of
+
+- the source code of the stage function and of the helpers it ``uses``,
+- its ``params`` (configuration that lives outside the function),
+- the bytes of its source files, and
+- the hashes of the stages it depends on.
+
+``artifact(name)`` returns the stored result when that hash is unchanged and only
+reruns the stages whose inputs changed. Every CSV in ``Dataset_CE/`` is a stage
+of its own (named after the file, e.g. ``"municipal_waste_per_capita"``) that
+returns the table cleaned by ``ce_quality`` at ingest.
+
+Notebooks and ``ce_app.py`` both use it:
+
+    from ce_pipeline import artifact
+    de_vs_eu = artifact("de_vs_eu")
+
+Usage:
+    python ce_pipeline.py            # build every stage, reporting which ones ran
+    python ce_pipeline.py de_vs_eu   # build one stage and its dependencies
+"""
+
+import glob
+import hashlib
+import inspect
+import os
+import sys
+import threading
+
+import pandas as pd
+
+import ce_ingest
+import ce_quality
+from ce_ingest import CACHE_DIR, DATA_DIR, ingest_sdmx_csv, load_cache
+
+ARTIFACT_DIR = os.path.join(CACHE_DIR, "artifacts")
+
+COUNTRY = 'Geopolitical entity (reporting)'
+
+STAGES = {}
+
+# (path, mtime, size) -> sha256 of the file, so unchanged files are not re-read
+_file_hashes = {}
+
+# Streamlit sessions are threads of one process: only one of them builds at a
+# time, since table stages rewrite the shared ingest cache directory
+_build_lock = threading.RLock()
+
+
+class Stage:
+    def __init__(self, name, func, deps=(), sources=(), uses=(), params=None):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.sources = list(sources)
+        self.uses = list(uses)
+        self.params = params
+
+
+def stage(name, deps=(), sources=(), uses=(), params=None):
+    """Register the decorated function as pipeline stage ``name``."""
+    def register(func):
+        if name in STAGES:
+            raise ValueError(f"Stage {name!r} is already registered")
+        STAGES[name] = Stage(name, func, deps, sources, uses, params)
+        return func
+    return register
+
+
+def _hash_file(path):
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _file_hashes:
+        with open(path, "rb") as f:
+            _file_hashes[key] = hashlib.sha256(f.read()).hexdigest()
+    return _file_hashes[key]
+
+
+def stage_hash(name):
+    """Content hash of stage ``name`` and everything upstream of it."""
+    s = STAGES[name]
+    h = hashlib.sha256(name.encode())
+    for func in [s.func] + s.uses:
+        h.update(inspect.getsource(func).encode())
+    h.update(repr(s.params).encode())
+    for path in s.sources:
+        h.update(_hash_file(path).encode())
+    for dep in s.deps:
+        h.update(stage_hash(dep).encode())
+    return h.hexdigest()[:16]
+
+
+def artifact_path(name, digest=None):
+    return os.path.join(ARTIFACT_DIR, f"{name}-{digest or stage_hash(name)}.parquet")
+
+
+def _materialize(name, ran):
+    path = artifact_path(name)
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+
+    with _build_lock:
+        # Another thread may have built it while this one waited
+        if os.path.exists(path):
+            return pd.read_parquet(path)
+
+        s = STAGES[name]
+        inputs = [_materialize(dep, ran) for dep in s.deps]
+        df = s.func(*inputs)
+
+        # Write under a temporary name first so concurrent readers never see a partial file
+        os.makedirs(ARTIFACT_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+        for old in glob.glob(os.path.join(ARTIFACT_DIR, f"{glob.escape(name)}-*.parquet")):
+            if old != path:
+                os.remove(old)
+        ran.append(name)
+        return df
+
+
+def artifact(name):
+    """Result of stage ``name``, rebuilding it (and stale dependencies) if needed."""
+    if name not in STAGES:
+        raise KeyError(f"Unknown pipeline stage {name!r}; known stages: {sorted(STAGES)}")
+    return _materialize(name, [])
+
+
+def run(names=None):
+    """Build the given stages (default: all) and return the names of those that ran."""
+    ran = []
+    for name in names or STAGES:
+        _materialize(name, ran)
+    return ran
+
+
+# --- Cleaned tables: one stage per CSV in Dataset_CE/ ---
+
+def _register_table(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+
+    # The ingest and cleaning code are sources too, so changing either rebuilds every table
+    @stage(name, sources=[path, ce_ingest.__file__, ce_quality.__file__])
+    def cleaned_table():
+        # Refreshes the ingest cache and its _quality.json report as well
+        ingest_sdmx_csv(path, name)
+        return load_cache(name)
+
+
+for _path in sorted(glob.glob(os.path.join(DATA_DIR, "*.csv"))):
+    _register_table(_path)
+
+
+# --- Shared helpers ---
+
+def recent(df, n_years):
+    """Rows of the last ``n_years`` years present in ``df``."""
+    years = sorted(df['TIME_PERIOD'].unique())[-n_years:]
+    return df[df['TIME_PERIOD'].isin(years)]
+
+
+def top_n_per_year(df, n=10, n_years=None):
+    """The ``n`` largest observations of every year, optionally over the last ``n_years``."""
+    if n_years:
+        df = recent(df, n_years)
+    return (
+        df.groupby('TIME_PERIOD', group_keys=False)
+        .apply(lambda x: x.nlargest(n, 'OBS_VALUE'))
+        .reset_index(drop=True)
+    )
+
+
+# --- Aggregates ---
+
+@stage("total_waste_top10_per_year", deps=["Total_waste_generation_per_capita"], uses=[top_n_per_year, recent])
+def total_waste_top10_per_year(df):
+    df = df[~df['is_aggregate']]
+    top10 = top_n_per_year(df, 10, n_years=20)
+    return top10.rename(columns={COUNTRY: 'country', 'TIME_PERIOD': 'year'})
+
+
+@stage("total_waste_latest_ranking", deps=["Total_waste_generation_per_capita"])
+def total_waste_latest_ranking(df):
+    df = df[~df['is_aggregate']]
+    latest_year = df['TIME_PERIOD'].max()
+    df_latest = df[df['TIME_PERIOD'] == latest_year]
+    ranking = df_latest.groupby(COUNTRY, as_index=False)['OBS_VALUE'].sum()
+    ranking = ranking.sort_values(by='OBS_VALUE', ascending=False).reset_index(drop=True)
+    ranking['TIME_PERIOD'] = latest_year
+    return ranking
+
+
+@stage("cmu_top10_per_year", deps=["Circular_material_use_rate"], uses=[top_n_per_year, recent])
+def cmu_top10_per_year(df):
+    df = df.loc[~df['is_aggregate'], [COUNTRY, 'TIME_PERIOD', 'OBS_VALUE']]
+    return top_n_per_year(df, 10, n_years=20)
+
+
+@stage("import_dependency_top10_per_year", deps=["Material import dependency"], uses=[top_n_per_year])
+def import_dependency_top10_per_year(df):
+    df = df[~df['is_aggregate'] & (df['TIME_PERIOD'] >= 2003)]
+    return top_n_per_year(df, 10)
+
+
+# --- Country vs EU: every indicator in one panel ---
+
+# indicator -> (table stage, filters picking one series per geo and year, chart title).
+# Left out: EU self-sufficiency for raw materials (EU only) and europe_population.
+PANEL_INDICATORS = {
+    "municipal_waste": ("municipal_waste_per_capita", {}, "Municipal waste (kg per capita)"),
+    "municipal_recycling": ("Recycling_rate_of_municipal_waste", {}, "Municipal waste recycling (%)"),
+    "total_waste": ("Total_waste_generation_per_capita", {}, "Total waste (kg per capita)"),
+    "waste_per_gdp": ("Generation of waste excluding major mineral wastes per GDP unit", {},
+                      "Waste per GDP (kg per 1000 EUR)"),
+    "waste_recycling": ("Recycling_rate_of_all_waste_excluding_major_mineral_waste", {},
+                        "Recycling rate, all waste (%)"),
+    "food_waste": ("Food_waste", {}, "Food waste (kg per capita)"),
+    "packaging_waste": ("Generation of packaging waste per capita", {}, "Packaging waste (kg per capita)"),
+    "packaging_recycling": ("Recycling rate of overall packaging", {"waste": "W1501"}, "Packaging recycling (%)"),
+    "plastic_packaging_waste": ("Generation_plastic_pkg_waste_per_capita", {},
+                                "Plastic packaging waste (kg per capita)"),
+    "plastic_packaging_recycling": ("Recycle_Plastic_pkging", {}, "Plastic packaging recycling (%)"),
+    "weee_recycling": ("Recycling rate of WEEE separately collected", {}, "WEEE recycling (%)"),
+    "circular_material_use": ("Circular_material_use_rate", {}, "Circular material use rate (%)"),
+    "material_footprint": ("Material_footprint", {}, "Material footprint (t per capita)"),
+    "import_dependency": ("Material import dependency", {}, "Material import dependency (%)"),
+    "exports_non_eu": ("Exports to non-EU countries", {}, "Exports to non-EU countries (t)"),
+    "resource_productivity": ("Resource_productivity", {}, "Resource productivity (index, 2000=100)"),
+    "consumption_footprint": ("Consumption_footprint", {"cons_fp": "SWS", "unit": "P_HAB"},
+                              "Consumption footprint (score per capita)"),
+    "consumption_climate": ("Consumption_footprint", {"cons_fp": "CCHG", "unit": "P_HAB"},
+                            "Consumption footprint, climate (per capita)"),
+    "ghg_emissions": ("GHG_emissions", {}, "GHG emissions (kg per capita)"),
+    "gross_value_added": ("Gross value added", {"indic_env": "GVA", "unit": "PC_GDP"},
+                          "Circular economy value added (% of GDP)"),
+    "private_investment": ("Private Investments", {"indic_env": "INV", "unit": "PC_GDP"},
+                           "Private investment (% of GDP)"),
+    "persons_employed": ("Persons employed", {"unit": "PC_EMP_FTE"}, "Persons employed (% of employment)"),
+    "patents": ("Patents related to waste management and recycling", {"unit": "P_MHAB"},
+                "Waste & wastewater climate patents (per M inhabitants)"),
+}
+
+_PANEL_TABLES = [table for table, _, _ in PANEL_INDICATORS.values()]
+
+
+@stage("indicator_panel", deps=_PANEL_TABLES, params=PANEL_INDICATORS)
+def indicator_panel(*tables):
+    """Wide table indexed by (geo, TIME_PERIOD) with one column per indicator.
+
+    ``artifact("indicator_panel").loc[["DE", "EU27_2020"]]`` returns every
+    indicator for Germany and the EU in a single indexed lookup.
+    """
+    columns = {}
+    for (indicator, (_, filters, _)), df in zip(PANEL_INDICATORS.items(), tables):
+        mask = pd.Series(True, index=df.index)
+        for column, code in filters.items():
+            mask &= df[column] == code
+        series = df[mask].set_index(['geo', 'TIME_PERIOD'])['OBS_VALUE']
+        if not series.index.is_unique:
+            raise ValueError(f"Indicator {indicator!r} has several values per geo and year; add a filter")
+        columns[indicator] = series
+    return pd.concat(columns, axis=1).sort_index()
+
+
+@stage("geo_names", deps=_PANEL_TABLES)
+def geo_names(*tables):
+    """Country name and aggregate flag of every geo code in the panel."""
+    names = pd.concat([df[['geo', COUNTRY, 'is_aggregate']] for df in tables])
+    return names.drop_duplicates('geo').set_index('geo').sort_index()
+
+
+# --- Germany vs EU27_2020 ---
+
+# Indicators compared in main.ipynb; their filters live in PANEL_INDICATORS
+DE_VS_EU_INDICATORS = ["packaging_recycling", "municipal_waste", "municipal_recycling", "circular_material_use"]
+
+
+@stage("de_vs_eu", deps=["indicator_panel"], params=DE_VS_EU_INDICATORS)
+def de_vs_eu(panel):
+    """Long table indexed by (indicator, geo) with the DE and EU27_2020 series.
+
+    ``artifact("de_vs_eu").loc[("municipal_waste", "DE")]`` is Germany's series.
+    """
+    wide = panel.loc[["DE", "EU27_2020"], DE_VS_EU_INDICATORS].reset_index()
+    long = wide.melt(id_vars=['geo', 'TIME_PERIOD'], var_name='indicator', value_name='OBS_VALUE')
+    long = long.dropna(subset=['OBS_VALUE']).sort_values(['indicator', 'geo', 'TIME_PERIOD'])
+    return long.set_index(['indicator', 'geo'])
+
+
+@stage("de_vs_eu_joined", deps=["de_vs_eu"])
+def de_vs_eu_joined(long):
+    """DE and EU27_2020 side by side per (indicator, year), as ``pd.merge`` on TIME_PERIOD gives."""
+    de = long.xs("DE", level='geo').set_index('TIME_PERIOD', append=True)
+    eu = long.xs("EU27_2020", level='geo').set_index('TIME_PERIOD', append=True)
+    return de.join(eu, how='inner', lsuffix='_GER', rsuffix='_EU')
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or None
+    ran = set(run(names))
+    for name in names or STAGES:
+        print(f"{'ran   ' if name in ran else 'cached'}  {name}")
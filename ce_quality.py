@@ -0,0 +1,252 @@
+"""Ingest-time validation and cleaning of Eurostat tables.
+
+``normalize`` runs once per table (or per chunk of a bulk dump) when it is
+ingested, so the dashboard can rely on clean, typed data:
+
+- ``TIME_PERIOD`` is an integer year and ``OBS_VALUE`` a float; rows without a
+  usable year or value are dropped and counted, rows without a value by flag
+  (``": c"`` -> ``{"c": 1}``) so confidential or unavailable cells stay visible
+  in the report.
+- ``is_aggregate`` marks EU / euro-area aggregates (EU27_2020, EA20, ...), so the
+  app filters on a boolean instead of scanning country labels.
+- ``OBS_FLAG`` is normalised to a string ("" when unflagged) and ``flag_label``
+  spells it out (``"be"`` -> ``"break in time series; estimated"``).
+
+``quality_report`` then checks the whole table for duplicate
+(geo, year, dimension) keys and for gaps in each series' years, taking the
+series' own reporting interval into account (biennial data has no gaps in
+odd years).
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Geo codes of the EU and euro-area aggregates all start with these prefixes
+AGGREGATE_PREFIXES = ("EU", "EA")
+
+# Eurostat observation status flags (a single observation can carry several)
+FLAG_MEANINGS = {
+    "b": "break in time series",
+    "c": "confidential",
+    "d": "definition differs",
+    "e": "estimated",
+    "f": "forecast",
+    "i": "value imputed",
+    "n": "not significant",
+    "p": "provisional",
+    "r": "revised",
+    "s": "Eurostat estimate",
+    "u": "low reliability",
+    "z": "not applicable",
+}
+
+# SDMX-CSV columns that are constant, empty or replaced by the columns added here
+_METADATA_COLUMNS = [
+    "STRUCTURE", "STRUCTURE_ID", "STRUCTURE_NAME", "Time", "Observation value",
+    "Observation status (Flag) V2 structure", "CONF_STATUS", "Confidentiality status (flag)",
+]
+
+
+def dimension_columns(df):
+    """Dimension code columns of a table, e.g. ``['freq', 'unit', 'geo']``.
+
+    Codes are lower-case identifiers (``wst_oper``, ``nace_r2``); the label
+    columns next to them in SDMX-CSV files are capitalised and contain spaces.
+    """
+    return [
+        c for c in df.columns
+        if c == c.lower() and " " not in c and c not in ("is_aggregate", "flag_label")
+    ]
+
+
+# Per-ingest counters from ``normalize``; an appending ingest adds them to the previous report's
+INGEST_COUNTERS = ("rows_in", "bad_time_period", "missing_values", "missing_by_flag", "rows_out")
+
+
+def report_columns(columns):
+    """The columns ``quality_report`` needs, out of a cleaned table's ``columns``."""
+    keys = dimension_columns(pd.DataFrame(columns=columns))
+    return keys + ["TIME_PERIOD", "OBS_FLAG", "is_aggregate"]
+
+
+def describe_flag(flag):
+    return "; ".join(FLAG_MEANINGS.get(ch, f"unknown flag '{ch}'") for ch in flag)
+
+
+def normalize(df):
+    """Return ``(clean_df, stats)`` for one raw table or chunk."""
+    stats = {"rows_in": len(df)}
+    df = df.drop(columns=[c for c in _METADATA_COLUMNS if c in df.columns])
+
+    # Step 1: types
+    df["TIME_PERIOD"] = pd.to_numeric(df["TIME_PERIOD"], errors="coerce")
+    df["OBS_VALUE"] = pd.to_numeric(df["OBS_VALUE"], errors="coerce")
+    bad_year = df["TIME_PERIOD"].isna()
+    missing_value = df["OBS_VALUE"].isna() & ~bad_year
+    stats["bad_time_period"] = int(bad_year.sum())
+    stats["missing_values"] = int(missing_value.sum())
+    if "OBS_FLAG" in df.columns:
+        missing_flags = df.loc[missing_value, "OBS_FLAG"].fillna("").astype(str).str.strip()
+        stats["missing_by_flag"] = {f: int(n) for f, n in missing_flags[missing_flags != ""].value_counts().items()}
+    df = df[~(bad_year | missing_value)].copy()
+    df["TIME_PERIOD"] = df["TIME_PERIOD"].astype("int64")
+    df["OBS_VALUE"] = df["OBS_VALUE"].astype("float64")
+
+    # Step 2: flags
+    flags = df["OBS_FLAG"] if "OBS_FLAG" in df.columns else pd.Series("", index=df.index)
+    df["OBS_FLAG"] = flags.fillna("").astype(str).str.strip()
+    labels = {f: describe_flag(f) for f in df["OBS_FLAG"].unique()}
+    df["flag_label"] = df["OBS_FLAG"].map(labels)
+
+    # Step 3: aggregates
+    df["is_aggregate"] = df["geo"].str.startswith(AGGREGATE_PREFIXES)
+
+    stats["rows_out"] = len(df)
+    return df.reset_index(drop=True), stats
+
+
+def merge_stats(total, stats):
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            merge_stats(total.setdefault(key, {}), value)
+        else:
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def find_duplicates(df, keys):
+    dup = df[df.duplicated(keys, keep=False)]
+    return dup[keys].drop_duplicates().astype(str).to_dict(orient="records")
+
+
+def reporting_step(years):
+    """Interval between a series' years: 1 for annual data, 2 for every other year."""
+    diffs = np.diff(np.sort(np.asarray(years)))
+    return int(np.gcd.reduce(diffs)) if len(diffs) else 1
+
+
+# A series' years are kept as one int with bit ``year`` set for every year present
+
+def _year_mask(years):
+    mask = 0
+    for year in years:
+        mask |= 1 << int(year)
+    return mask
+
+
+def _mask_years(mask):
+    years = []
+    while mask:
+        low = mask & -mask
+        years.append(low.bit_length() - 1)
+        mask ^= low
+    return years
+
+
+def _is_contiguous(mask):
+    run = mask >> ((mask & -mask).bit_length() - 1)
+    return run & (run + 1) == 0
+
+
+def _series_masks(df, series_keys):
+    """``{series key tuple (as strings): year mask}`` for the series in ``df``."""
+    years = df.groupby(series_keys, observed=True, sort=False)["TIME_PERIOD"].unique()
+    masks = {}
+    for key, present in years.items():
+        key = key if isinstance(key, tuple) else (key,)
+        masks[tuple(map(str, key))] = _year_mask(present)
+    return masks
+
+
+def _year_gaps(masks, series_keys):
+    gaps = []
+    for key in sorted(masks):
+        if _is_contiguous(masks[key]):
+            continue
+        years = _mask_years(masks[key])
+        step = reporting_step(years)
+        missing = sorted(set(range(years[0], years[-1] + 1, step)) - set(years))
+        if missing:
+            gaps.append({**dict(zip(series_keys, key)), "step": step, "missing_years": missing})
+    return gaps
+
+
+def find_year_gaps(df, series_keys):
+    """Series with years missing at their own reporting step, with those years listed."""
+    return _year_gaps(_series_masks(df, series_keys), series_keys)
+
+
+class ReportBuilder:
+    """Quality report of a whole table, fed one cleaned chunk at a time.
+
+    Only counters and one entry per series (its key and the years seen) are
+    kept, so memory grows with the number of series, not of rows. A series may
+    be spread over several chunks or appended files: duplicates and year gaps
+    are checked against everything added so far.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.dimensions = []
+        self.flags = {}
+        self.series = {}
+        self.duplicate_keys = []
+
+    @property
+    def series_keys(self):
+        return [c for c in self.dimensions if c != "freq"]
+
+    def add(self, df):
+        """Add the ``report_columns`` of a cleaned chunk."""
+        if not self.dimensions:
+            self.dimensions = dimension_columns(df)
+        if df.empty:
+            return self
+        keys = self.series_keys
+        self.rows += len(df)
+        flagged = df.loc[df["OBS_FLAG"] != "", "OBS_FLAG"].value_counts()
+        merge_stats(self.flags, {str(f): int(n) for f, n in flagged.items()})
+
+        # Repeated within the chunk, then against the years of earlier chunks
+        self.duplicate_keys += find_duplicates(df, keys + ["TIME_PERIOD"])
+        for key, mask in _series_masks(df, keys).items():
+            seen = self.series.get(key, 0)
+            for year in _mask_years(seen & mask):
+                self.duplicate_keys.append({**dict(zip(keys, key)), "TIME_PERIOD": str(year)})
+            self.series[key] = seen | mask
+        return self
+
+    def report(self, name, stats=None):
+        """Machine-readable summary of everything added so far."""
+        keys = self.series_keys
+        masks = list(self.series.values())
+        geos = {key[keys.index("geo")] for key in self.series} if "geo" in keys else set()
+        flags = sorted(self.flags.items(), key=lambda item: -item[1])
+        first = min((m & -m).bit_length() for m in masks) - 1 if masks else None
+        last = max(m.bit_length() for m in masks) - 1 if masks else None
+        return {
+            "dataset": name,
+            **(stats or {}),
+            "rows": self.rows,
+            "dimensions": self.dimensions,
+            "years": [first, last] if masks else [],
+            "geos": len(geos),
+            "aggregate_geos": sorted(g for g in geos if g.startswith(AGGREGATE_PREFIXES)),
+            "flags": {f: {"count": n, "meaning": describe_flag(f)} for f, n in flags},
+            "duplicate_keys": self.duplicate_keys,
+            "year_gaps": _year_gaps(self.series, keys),
+        }
+
+
+def quality_report(df, name, stats=None):
+    """Machine-readable summary of a cleaned table (its ``report_columns`` suffice)."""
+    return ReportBuilder().add(df).report(name, stats)
+
+
+def write_report(report, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# The ce_* modules live at the repository root, next to ce_app.py, and like the
+# app they find Dataset_CE/ relative to the working directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+
+
+@pytest.fixture
+def bulk_sample():
+    """Three-series bulk TSV dump with flags, missing values and padded year headers."""
+    return os.path.join(FIXTURES, "bulk_sample.tsv.gz")
@@ -0,0 +1,164 @@
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+import pytest
+from plotly.subplots import make_subplots
+
+import ce_charts
+from ce_figures import WEBGL_MIN_POINTS, compact_figure, infer_decimals
+from ce_pipeline import artifact
+
+# Trace fields that carry the plotted data
+DATA_FIELDS = [("x",), ("y",), ("z",), ("locations",), ("text",), ("customdata",), ("marker", "size")]
+# plotly.js defaults of those fields, which compact_figure may leave out
+DEFAULTS = {("marker", "size"): 6}
+
+
+def decode(obj):
+    """JSON figure spec with plotly's base64 typed arrays turned back into lists."""
+    if isinstance(obj, dict):
+        if "bdata" in obj:
+            array = np.frombuffer(base64.b64decode(obj["bdata"]), dtype=obj["dtype"])
+            if "shape" in obj:
+                array = array.reshape([int(n) for n in str(obj["shape"]).split(",")])
+            return array.tolist()
+        return {k: decode(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [decode(v) for v in obj]
+    return obj
+
+
+def lookup(trace, path):
+    for key in path:
+        if not isinstance(trace, dict) or key not in trace:
+            return None
+        trace = trace[key]
+    return trace
+
+
+def field(trace, path, base):
+    """``trace[path]``; unset fields fall back to ``base`` (as plotly merges frames) and then the default."""
+    for source in (trace, base):
+        value = lookup(source, path)
+        if value is not None:
+            return value
+    return DEFAULTS.get(path)
+
+
+def plotted(fig):
+    """Data fields of every trace of the base figure and of every frame merged onto it."""
+    spec = decode(json.loads(pio.to_json(fig, validate=False)))
+    base = spec["data"]
+    views = [[{path: field(t, path, {}) for path in DATA_FIELDS} for t in base]]
+    for frame in spec.get("frames", []):
+        views.append([
+            {path: field(t, path, base[i]) for path in DATA_FIELDS}
+            for i, t in enumerate(frame.get("data", []))
+        ])
+    return views
+
+
+def assert_same_data(before, after):
+    assert len(before) == len(after)
+    for view_before, view_after in zip(before, after):
+        assert len(view_before) == len(view_after)
+        for trace_before, trace_after in zip(view_before, view_after):
+            for path in DATA_FIELDS:
+                a, b = trace_before[path], trace_after[path]
+                try:
+                    a, b = np.asarray(a, dtype="float64"), np.asarray(b, dtype="float64")
+                except (TypeError, ValueError):
+                    assert a == b, path
+                else:
+                    np.testing.assert_allclose(b, a, rtol=0, atol=1e-9, equal_nan=True, err_msg=str(path))
+
+
+def test_animated_bar_keeps_data():
+    df = pd.DataFrame({
+        "country": ["DE", "FR", "NL"] * 3,
+        "year": np.repeat([2020, 2021, 2022], 3),
+        "value": [12.3, 4.5, 7.0, 12.3, 5.1, 7.0, 13.0, 5.1, 6.9],
+    })
+    fig = px.bar(df, x="country", y="value", color="country", animation_frame="year")
+    compact = compact_figure(fig)
+    assert_same_data(plotted(fig), plotted(compact))
+    # Fields identical in every frame are sent once, in the base trace
+    assert all(t.x is None for frame in compact.frames for t in frame.data)
+
+
+def test_scatter_keeps_data():
+    x = np.arange(2000, 2024)
+    fig = go.Figure([
+        go.Scatter(x=x, y=np.round(np.linspace(0, 1, len(x)) * i, 2), mode="lines+markers",
+                   marker=dict(size=6, symbol="circle"))
+        for i in range(12)
+    ])
+    assert_same_data(plotted(fig), plotted(compact_figure(fig)))
+
+
+@pytest.mark.parametrize("values, decimals", [
+    ([1.0, 2.0, 300.0], 0),
+    ([12.3, 4.5, -7.0], 1),
+    ([1.25, 3.5], 2),
+    ([0.1 + 0.2], 1),
+    ([1 / 3], 6),
+])
+def test_infer_decimals(values, decimals):
+    assert infer_decimals(values) == decimals
+
+
+def test_infer_decimals_is_lossless():
+    rng = np.random.default_rng(0)
+    for d in range(7):
+        values = np.round(rng.uniform(-1000, 1000, 200), d)
+        np.testing.assert_allclose(np.round(values, infer_decimals(values)), values, rtol=0, atol=1e-9)
+
+
+def test_webgl_only_for_subplots_over_the_threshold():
+    n = WEBGL_MIN_POINTS // 2
+    fig = make_subplots(rows=1, cols=2)
+    for _ in range(2):
+        fig.add_trace(go.Scatter(x=np.arange(n), y=np.random.rand(n)), row=1, col=1)
+        fig.add_trace(go.Scatter(x=np.arange(20), y=np.random.rand(20)), row=1, col=2)
+    types = [(t.xaxis, t.type) for t in compact_figure(fig).data]
+    assert types == [("x", "scattergl"), ("x2", "scatter")] * 2
+
+
+def app_charts():
+    """The dashboard's charts, built as ce_app.py builds them."""
+    panel = artifact("indicator_panel")
+    return {
+        "Top waste generators": ce_charts.top_waste_generators_bar(artifact("total_waste_top10_per_year")),
+        "Plastic packaging waste": ce_charts.top10_lines(
+            artifact("Generation_plastic_pkg_waste_per_capita"), 20, yaxis_title="kg"),
+        "Plastic packaging recycling": ce_charts.top10_lines(
+            artifact("Recycle_Plastic_pkging"), 20, yaxis_title="%"),
+        "Municipal waste generation": ce_charts.top10_lines(
+            artifact("municipal_waste_per_capita"), 20, title="t", yaxis_title="kg"),
+        "Municipal waste recycling": ce_charts.top10_recycling_lines(
+            artifact("Recycling_rate_of_municipal_waste"), 10, title="t", yaxis_title="%"),
+        "WEEE recycling": ce_charts.top10_lines(
+            artifact("Recycling rate of WEEE separately collected"), 20, title="t", yaxis_title="%",
+            yaxis=dict(range=[60, 100])),
+        "CMU rate map": ce_charts.cmu_choropleth(artifact("Circular_material_use_rate")),
+        "CMU rate top 10": ce_charts.cmu_top10_bar(artifact("cmu_top10_per_year")),
+        "Material import dependency": ce_charts.import_dependency_bubbles(
+            artifact("import_dependency_top10_per_year")),
+        "Country vs EU": ce_charts.country_vs_eu_small_multiples(
+            panel.loc[["DE", "EU27_2020"]], "DE", "Germany"),
+    }
+
+
+def test_app_charts_keep_their_data():
+    charts = app_charts()
+    assert len(charts) == 10
+    for name, fig in charts.items():
+        try:
+            assert_same_data(plotted(fig), plotted(compact_figure(fig)))
+        except AssertionError as e:
+            raise AssertionError(f"{name}: {e}") from e
@@ -0,0 +1,63 @@
+import math
+
+import pandas as pd
+import pytest
+
+from ce_ingest import iter_bulk_tsv, split_value_flag
+
+
+@pytest.mark.parametrize("cell, value, flag", [
+    ("12.3 be", 12.3, "be"),
+    (": c", math.nan, "c"),
+    (":", math.nan, ""),
+    ("-4.5", -4.5, ""),
+    ("7 ", 7.0, ""),
+])
+def test_split_value_flag(cell, value, flag):
+    values, flags = split_value_flag(pd.Series([cell]))
+    assert values.dtype == "float64"
+    if math.isnan(value):
+        assert math.isnan(values[0])
+    else:
+        assert values[0] == value
+    assert flags[0] == flag
+
+
+def read_all(path, chunksize):
+    return pd.concat(iter_bulk_tsv(path, chunksize=chunksize), ignore_index=True)
+
+
+def test_iter_bulk_tsv_long_format(bulk_sample):
+    df = read_all(bulk_sample, chunksize=10)
+    assert list(df.columns) == ["freq", "unit", "geo", "TIME_PERIOD", "OBS_VALUE", "OBS_FLAG"]
+    # Year headers "2020 " etc. are stripped to integers
+    assert df["TIME_PERIOD"].dtype == "int64"
+    assert sorted(df["TIME_PERIOD"].unique()) == [2020, 2021, 2022]
+
+    obs = df.set_index(["geo", "TIME_PERIOD"])
+    assert obs.loc[("DE", 2020), "OBS_VALUE"] == 12.3
+    assert obs.loc[("DE", 2020), "OBS_FLAG"] == "be"
+    assert obs.loc[("FR", 2020), "OBS_VALUE"] == -4.5
+    assert obs.loc[("FR", 2022), "OBS_FLAG"] == "p"
+
+
+def test_iter_bulk_tsv_missing_values(bulk_sample):
+    obs = read_all(bulk_sample, chunksize=10).set_index(["geo", "TIME_PERIOD"])
+    # ": c" keeps its flag with a NaN value
+    assert math.isnan(obs.loc[("DE", 2021), "OBS_VALUE"])
+    assert obs.loc[("DE", 2021), "OBS_FLAG"] == "c"
+    # ":" and ": " without a flag carry nothing and are dropped
+    assert ("DE", 2022) not in obs.index
+    assert ("EU27_2020", 2020) not in obs.index
+
+
+def test_iter_bulk_tsv_chunk_boundary(bulk_sample):
+    chunks = list(iter_bulk_tsv(bulk_sample, chunksize=2))
+    assert [sorted(c["geo"].unique()) for c in chunks] == [["DE", "FR"], ["EU27_2020"]]
+    # Every chunk after the first reuses the header parsed from the first one
+    def by_key(df):
+        return df.sort_values(["geo", "TIME_PERIOD"]).reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(
+        by_key(pd.concat(chunks, ignore_index=True)), by_key(read_all(bulk_sample, chunksize=10))
+    )
@@ -0,0 +1,58 @@
+import os
+
+import pandas as pd
+import pytest
+
+import ce_pipeline
+from ce_pipeline import artifact, run, stage
+
+
+@pytest.fixture
+def dag(tmp_path, monkeypatch):
+    """Two source files and three stages: a <- a.csv, b <- b.csv, total <- (a, b)."""
+    monkeypatch.setattr(ce_pipeline, "STAGES", {})
+    monkeypatch.setattr(ce_pipeline, "ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    paths = {}
+    for name, values in {"a": [1, 2], "b": [10, 20]}.items():
+        paths[name] = tmp_path / f"{name}.csv"
+        pd.DataFrame({"OBS_VALUE": values}).to_csv(paths[name], index=False)
+
+    @stage("a", sources=[str(paths["a"])])
+    def a():
+        return pd.read_csv(paths["a"])
+
+    @stage("b", sources=[str(paths["b"])])
+    def b():
+        return pd.read_csv(paths["b"])
+
+    @stage("total", deps=["a", "b"])
+    def total(a, b):
+        return pd.DataFrame({"OBS_VALUE": [a["OBS_VALUE"].sum() + b["OBS_VALUE"].sum()]})
+
+    return paths
+
+
+def test_first_run_builds_every_stage(dag):
+    assert sorted(run()) == ["a", "b", "total"]
+    assert artifact("total")["OBS_VALUE"].tolist() == [33]
+
+
+def test_second_run_builds_nothing(dag):
+    run()
+    assert run() == []
+
+
+def test_touching_a_source_builds_nothing(dag):
+    run()
+    stat = os.stat(dag["a"])
+    os.utime(dag["a"], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert run() == []
+
+
+def test_editing_a_source_rebuilds_it_and_downstream_only(dag):
+    run()
+    pd.DataFrame({"OBS_VALUE": [1, 2, 3]}).to_csv(dag["a"], index=False)
+    assert sorted(run()) == ["a", "total"]
+    assert artifact("total")["OBS_VALUE"].tolist() == [36]
+    # The superseded artifacts are removed
+    assert len(os.listdir(ce_pipeline.ARTIFACT_DIR)) == 3
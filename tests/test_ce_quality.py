@@ -0,0 +1,82 @@
+import pandas as pd
+
+from ce_ingest import ingest_bulk_tsv, load_cache, load_report
+from ce_quality import ReportBuilder, find_year_gaps, reporting_step
+
+
+def series(geo, years):
+    return pd.DataFrame({"geo": geo, "TIME_PERIOD": years, "OBS_VALUE": 1.0})
+
+
+def test_reporting_step():
+    assert reporting_step([2010, 2011, 2013]) == 1
+    assert reporting_step([2004, 2006, 2010]) == 2
+    assert reporting_step([2020]) == 1
+
+
+def test_biennial_series_has_no_gaps():
+    df = series("DE", [2004, 2006, 2008, 2010])
+    assert find_year_gaps(df, ["geo"]) == []
+
+
+def test_gaps_at_the_series_own_step():
+    df = pd.concat([series("DE", [2004, 2006, 2010]), series("FR", [2010, 2011, 2013])])
+    assert find_year_gaps(df, ["geo"]) == [
+        {"geo": "DE", "step": 2, "missing_years": [2008]},
+        {"geo": "FR", "step": 1, "missing_years": [2012]},
+    ]
+
+
+def test_bulk_ingest_report(bulk_sample, tmp_path):
+    report = ingest_bulk_tsv(bulk_sample, "sample", cache_dir=str(tmp_path), chunksize=2)
+    assert report == load_report("sample", cache_dir=str(tmp_path))
+
+    df = load_cache("sample", cache_dir=str(tmp_path))
+    assert len(df) == report["rows"] == 6
+    assert df["OBS_VALUE"].notna().all()
+    # ": c" has no value: dropped from the table but counted by flag in the report
+    assert report["missing_by_flag"] == {"c": 1}
+    assert report["flags"] == {
+        "be": {"count": 1, "meaning": "break in time series; estimated"},
+        "p": {"count": 1, "meaning": "provisional"},
+    }
+    assert report["aggregate_geos"] == ["EU27_2020"]
+    assert report["duplicate_keys"] == []
+
+
+def test_report_across_chunks():
+    # One series split over two chunks: a gap and a duplicate only visible together
+    builder = ReportBuilder()
+    for years in ([2010, 2011], [2011, 2013]):
+        builder.add(series("DE", years).assign(freq="A", OBS_FLAG="", is_aggregate=False))
+    report = builder.report("split")
+    assert report["rows"] == 4
+    assert report["years"] == [2010, 2013]
+    assert report["duplicate_keys"] == [{"geo": "DE", "TIME_PERIOD": "2011"}]
+    assert report["year_gaps"] == [{"geo": "DE", "step": 1, "missing_years": [2012]}]
+
+
+def test_bulk_ingest_report_does_not_depend_on_chunksize(bulk_sample, tmp_path):
+    small = ingest_bulk_tsv(bulk_sample, "small", cache_dir=str(tmp_path), chunksize=2)
+    large = ingest_bulk_tsv(bulk_sample, "large", cache_dir=str(tmp_path), chunksize=100)
+    assert {**small, "dataset": None} == {**large, "dataset": None}
+
+
+def test_bulk_ingest_without_values(tmp_path):
+    dump = tmp_path / "empty.tsv"
+    dump.write_text("freq,geo\\TIME_PERIOD\t2020 \t2021 \nA,DE\t: c\t:\n")
+    report = ingest_bulk_tsv(str(dump), "empty", cache_dir=str(tmp_path / "cache"))
+    assert report["rows"] == 0
+    assert report["missing_by_flag"] == {"c": 1}
+    assert report["years"] == []
+
+
+def test_append_report_covers_whole_table(bulk_sample, tmp_path):
+    ingest_bulk_tsv(bulk_sample, "sample", cache_dir=str(tmp_path), chunksize=2)
+    report = ingest_bulk_tsv(bulk_sample, "sample", cache_dir=str(tmp_path), chunksize=2, replace=False)
+    assert report["rows"] == report["rows_out"] == 12
+    assert report["rows_in"] == 14
+    assert report["missing_by_flag"] == {"c": 2}
+    assert report["flags"]["p"]["count"] == 2
+    # Every observation of the second copy repeats one of the first
+    assert len(report["duplicate_keys"]) == 6